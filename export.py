@@ -0,0 +1,161 @@
+'''
+export.py
+Exports the optimized schedule to iCalendar (.ics) and CSV so it can be synced to a calendar
+Events are generated day by day and streamed into a buffered file, so long horizons are never built in memory
+'''
+
+import csv
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from scheduling import time_to_minutes
+
+# Constants
+ICS_FILENAME = "schedule.ics"
+CANCEL_FILENAME = "schedule_cancel.ics"  # METHOD:CANCEL for events that disappeared since the last export
+CSV_FILENAME = "schedule.csv"
+EXPORT_STATE_FILENAME = "export_state.json"  # Hash and event UIDs of every day as of the last export
+BUFFER_SIZE = 64 * 1024  # Write buffer in bytes
+CSV_HEADER = ["date", "weekday", "type", "start", "end", "duration_minutes"]
+
+def day_hash(shifts):#Stable fingerprint of one day's shifts
+    return hashlib.sha1(json.dumps(shifts, sort_keys=True).encode("utf-8")).hexdigest()
+
+def parse_date(date_str):#"MM/DD/YYYY" -> date, cheaper than strptime
+    month, day, year = date_str.split("/")
+    return date(int(year), int(month), int(day))
+
+def load_export_state():
+    """Load the day hashes and UIDs saved by the last export, as {date: {"hash": ..., "uids": [...]}}."""
+    if not os.path.exists(EXPORT_STATE_FILENAME):
+        return {}
+    with open(EXPORT_STATE_FILENAME, "r") as file:
+        state = json.load(file)
+    # Older state files only stored the hash
+    return {date_str: entry if isinstance(entry, dict) else {"hash": entry, "uids": []}
+            for date_str, entry in state.items()}
+
+def save_export_state(state):
+    """Save the day hashes and UIDs of this export."""
+    with open(EXPORT_STATE_FILENAME, "w") as file:
+        json.dump(state, file, indent=4)
+
+def iter_days(schedule, changed_only=False, state=None):
+    '''
+    Yields (date, date_str, shifts) for each day in date order
+    If changed_only is set, days whose hash matches state (from the last export) are skipped
+    '''
+    for date_str in sorted(schedule, key=parse_date):
+        shifts = schedule[date_str]
+        if changed_only and state is not None and state.get(date_str, {}).get("hash") == day_hash(shifts):
+            continue
+        yield parse_date(date_str), date_str, shifts
+
+def iter_events(days):
+    '''
+    Yields (date_str, index, shift, start, end) with start/end as datetimes
+    A shift that ends at or before its start (e.g. SLEEP from 10:00 PM to 06:00 AM) ends on the next day
+    '''
+    for day_date, date_str, shifts in days:
+        midnight = datetime(day_date.year, day_date.month, day_date.day)
+        for index, shift in enumerate(shifts):
+            start_minutes = time_to_minutes(shift["start_time"])
+            end_minutes = time_to_minutes(shift["end_time"])
+            if end_minutes <= start_minutes:  # Crosses midnight
+                end_minutes += 24 * 60
+            yield (date_str, index, shift,
+                   midnight + timedelta(minutes=start_minutes),
+                   midnight + timedelta(minutes=end_minutes))
+
+def event_uid(shift, start):#Same shift type at the same start keeps its UID when other shifts move
+    return f"{start:%Y%m%dT%H%M}-{shift['type']}@scheduler"
+
+def day_uids(date_str, shifts):#UIDs of every event of one day
+    return [event_uid(shift, start) for _, _, shift, start, _ in iter_events([(parse_date(date_str), date_str, shifts)])]
+
+def ics_lines(days):
+    """Yield the lines (CRLF terminated) of an iCalendar document, one VEVENT per shift."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//scheduler//schedule export//EN\r\n"
+    yield "METHOD:PUBLISH\r\n"
+    for date_str, index, shift, start, end in iter_events(days):
+        # UID is stable per day, type and start, so re-importing a changed day replaces its events
+        uid = event_uid(shift, start)
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:{uid}\r\n"
+        yield f"DTSTAMP:{stamp}\r\n"
+        yield f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n"
+        yield f"DTEND:{end:%Y%m%dT%H%M%S}\r\n"
+        yield f"SUMMARY:{shift['type']}\r\n"
+        yield "END:VEVENT\r\n"
+    yield "END:VCALENDAR\r\n"
+
+def cancel_lines(uids):
+    """Yield the lines of a METHOD:CANCEL iCalendar document for events that no longer exist."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//scheduler//schedule export//EN\r\n"
+    yield "METHOD:CANCEL\r\n"
+    for uid in uids:
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:{uid}\r\n"
+        yield f"DTSTAMP:{stamp}\r\n"
+        yield f"DTSTART:{uid[:13]}00\r\n"  # The UID starts with the event start
+        yield "SEQUENCE:1\r\n"
+        yield "STATUS:CANCELLED\r\n"
+        yield "END:VEVENT\r\n"
+    yield "END:VCALENDAR\r\n"
+
+def csv_rows(days):
+    """Yield CSV rows, one per shift, after the header."""
+    yield CSV_HEADER
+    for date_str, index, shift, start, end in iter_events(days):
+        yield [date_str, start.strftime("%A"), shift["type"],
+               start.strftime("%Y-%m-%d %H:%M"), end.strftime("%Y-%m-%d %H:%M"),
+               int((end - start).total_seconds() // 60)]
+
+def export_ics(schedule, filename=ICS_FILENAME, changed_only=False, state=None):
+    """Stream the schedule into an iCalendar file."""
+    with open(filename, "w", buffering=BUFFER_SIZE, newline="") as file:
+        file.writelines(ics_lines(iter_days(schedule, changed_only, state)))
+
+def export_csv(schedule, filename=CSV_FILENAME, changed_only=False, state=None):
+    """Stream the schedule into a CSV file."""
+    with open(filename, "w", buffering=BUFFER_SIZE, newline="") as file:
+        csv.writer(file).writerows(csv_rows(iter_days(schedule, changed_only, state)))
+
+def export_schedule(schedule, changed_only=False):
+    '''
+    Export the schedule to both iCalendar and CSV
+    If changed_only is set, only days that changed since the last export are written
+    Returns the number of days exported
+    '''
+    state = load_export_state()
+    exported = sum(1 for _ in iter_days(schedule, changed_only, state))
+
+    export_ics(schedule, changed_only=changed_only, state=state)
+    export_csv(schedule, changed_only=changed_only, state=state)
+
+    # Cancel events exported before that are gone now, so the calendar does not keep stale copies
+    new_state = {date_str: {"hash": day_hash(shifts), "uids": day_uids(date_str, shifts)}
+                 for date_str, shifts in schedule.items()}
+    cancelled = [uid for date_str, entry in new_state.items()
+                 for uid in state.get(date_str, {}).get("uids", []) if uid not in entry["uids"]]
+    with open(CANCEL_FILENAME, "w", buffering=BUFFER_SIZE, newline="") as file:
+        file.writelines(cancel_lines(cancelled))
+
+    state.update(new_state)
+    save_export_state(state)
+    return exported
+
+def input_export(schedule):
+    """Ask how to export, then export the schedule."""
+    changed_only = input("Export only days changed since the last export (y/n)? ").lower() == 'y'
+    exported = export_schedule(schedule, changed_only)
+    print(f"Exported {exported} day(s) to {ICS_FILENAME} and {CSV_FILENAME} (removed events in {CANCEL_FILENAME}).")
+    return schedule
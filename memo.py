@@ -0,0 +1,78 @@
+'''
+memo.py
+Persistent least-recently-used cache of optimization results, kept in one JSON file
+Entries are evicted oldest-first once the file would grow past MEMO_MAX_BYTES
+A hit only reorders the cache in memory; the order is saved with the next put, or at exit
+'''
+
+import atexit
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+# Constants
+MEMO_FILENAME = "optimize_cache.json"
+MEMO_MAX_BYTES = 1024 * 1024  # Size bound of the cached results
+
+_memo = None  # key -> (size in bytes, serialized result), least recently used first
+_unsaved = False  # True when hits have reordered the cache since it was last saved
+
+def load_memo():
+    """Load the cache from file once, then reuse it."""
+    global _memo
+    if _memo is None:
+        _memo = OrderedDict()
+        if os.path.exists(MEMO_FILENAME):
+            try:
+                with open(MEMO_FILENAME, "r") as file:
+                    for key, value in json.load(file):
+                        _memo[key] = (len(value), value)
+            except (OSError, ValueError, TypeError) as error:  # Only a cache, start over rather than fail
+                print(f"Ignoring unreadable {MEMO_FILENAME}: {error}")
+                _memo.clear()
+    return _memo
+
+def save_memo():
+    """Save the cache to file, least recently used first. Written to a temporary file first so a crash cannot truncate it."""
+    global _unsaved
+    directory = os.path.dirname(os.path.abspath(MEMO_FILENAME))
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".optimize_cache.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump([[key, value] for key, (size, value) in _memo.items()], file)
+        os.replace(temp_name, MEMO_FILENAME)
+    except BaseException:
+        os.remove(temp_name)
+        raise
+    _unsaved = False
+
+def flush_memo():
+    """Save the cache if hits have reordered it since the last save."""
+    if _memo is not None and _unsaved:
+        save_memo()
+
+atexit.register(flush_memo)
+
+def memo_get(key):
+    """Return a fresh copy of the cached result for key, or None on a miss."""
+    global _unsaved
+    memo = load_memo()
+    if key not in memo:
+        return None
+    memo.move_to_end(key)  # Now the most recently used
+    _unsaved = True
+    return json.loads(memo[key][1])
+
+def memo_put(key, result):
+    """Cache a JSON-serializable result under key, evicting the least recently used entries if needed."""
+    memo = load_memo()
+    value = json.dumps(result)
+    memo[key] = (len(value), value)
+    memo.move_to_end(key)
+
+    total = sum(size for size, _ in memo.values())
+    while total > MEMO_MAX_BYTES and len(memo) > 1:
+        _, (size, _) = memo.popitem(last=False)
+        total -= size
+    save_memo()
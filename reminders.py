@@ -0,0 +1,136 @@
+'''
+reminders.py
+Fires reminders at the start of upcoming PREP, COMMUTE, JOB_SEARCH and SLEEP shifts
+Upcoming starts are kept in a min-heap and an asyncio loop sleeps until the earliest one, so nothing is polled
+'''
+
+import asyncio
+import heapq
+import json
+import subprocess
+import threading
+from datetime import datetime
+
+from export import iter_days, iter_events
+
+# Constants
+REMINDER_TYPES = ["PREP", "COMMUTE", "JOB_SEARCH", "SLEEP"]
+WEBHOOK_FILENAME = "reminders.jsonl"  # Local stand-in for a webhook endpoint
+
+#Notifiers, each is called as notifier(start, date, shift)
+def stdout_notifier(start, date, shift):
+    print(f"\nReminder: {shift['type']} starts at {shift['start_time']} ({date})")
+
+def command_notifier(command):
+    '''
+    Build a notifier that runs a desktop notification command, e.g. ["notify-send", "Scheduler"]
+    The reminder text is passed as the last argument
+    '''
+    def notify(start, date, shift):
+        text = f"{shift['type']} starts at {shift['start_time']}"
+        subprocess.run(command + [text], check=False)
+    return notify
+
+def webhook_notifier(filename=WEBHOOK_FILENAME):
+    """Build a notifier that appends each reminder as a JSON line, standing in for a webhook POST."""
+    def notify(start, date, shift):
+        with open(filename, "a") as file:
+            file.write(json.dumps({"date": date, "start": start.isoformat(), **shift}) + "\n")
+    return notify
+
+def upcoming_entries(schedule, now=None):
+    '''
+    Returns {key: (start, date, shift)} for every reminder type shift that has not started yet
+    key is (date, type, start_time, end_time), so a shift that moved or was resized gets a new key
+    '''
+    now = now or datetime.now()
+    entries = {}
+    for date, index, shift, start, end in iter_events(iter_days(schedule)):
+        if shift["type"] in REMINDER_TYPES and start > now:
+            key = (date, shift["type"], shift["start_time"], shift["end_time"])
+            entries[key] = (start, date, shift)
+    return entries
+
+class ReminderEngine:
+    '''
+    Holds upcoming shift starts in a min-heap of (start, key) and fires the notifiers when each is due
+    update() diffs a re-optimized schedule against the current entries, so only changed shifts are touched
+    Removed entries are left in the heap and skipped when they reach the top (lazy deletion)
+    '''
+    def __init__(self, notifiers=None):
+        self.notifiers = notifiers or [stdout_notifier]
+        self.entries = {}  # key -> (start, date, shift)
+        self.heap = []  # (start, key)
+        self.loop = None
+        self.changed = None  # asyncio.Event, set whenever the heap top may have moved
+
+    def _apply(self, new_entries):#Replace only the entries that changed
+        for key in self.entries.keys() - new_entries.keys():
+            del self.entries[key]
+        for key, entry in new_entries.items():
+            if key not in self.entries:
+                self.entries[key] = entry
+                heapq.heappush(self.heap, (entry[0], key))
+
+        # Drop stale items once they outnumber the live ones
+        if len(self.heap) > 2 * len(self.entries):
+            self.heap = [(entry[0], key) for key, entry in self.entries.items()]
+            heapq.heapify(self.heap)
+
+        if self.changed is not None:
+            self.changed.set()
+
+    def update(self, schedule):
+        """Load a (re-)optimized schedule. Safe to call from outside the reminder thread."""
+        new_entries = upcoming_entries(schedule)
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._apply, new_entries)
+        else:
+            self._apply(new_entries)
+
+    def _pop_due(self, now):#Pop every live entry that has started by now
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            start, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == start:  # Skip stale heap items
+                del self.entries[key]
+                due.append(entry)
+        return due
+
+    def _next_start(self):#Start of the earliest live entry, or None
+        while self.heap and self.heap[0][1] not in self.entries:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    async def run(self):
+        """Sleep until the next shift start, fire the notifiers, repeat. Wakes early only on update()."""
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        while True:
+            self.changed.clear()
+            next_start = self._next_start()
+            if next_start is None:
+                await self.changed.wait()
+                continue
+
+            delay = (next_start - datetime.now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.changed.wait(), timeout=delay)
+                    continue  # Schedule changed, recompute the next deadline
+                except asyncio.TimeoutError:
+                    pass
+
+            for start, date, shift in self._pop_due(datetime.now()):
+                for notify in self.notifiers:
+                    try:
+                        notify(start, date, shift)
+                    except Exception as error:  # A broken notifier must not stop later reminders
+                        print(f"\nReminder notifier failed: {error!r}")
+
+    def start_in_thread(self):
+        """Run the reminder loop in a background thread so the menu stays usable."""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        thread.start()
+        return thread
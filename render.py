@@ -0,0 +1,101 @@
+'''
+render.py
+Renders the schedule as a text list, a compact timeline grid, or HTML
+Each day is rendered once and cached by a hash of its shifts; only days whose shifts changed are re-rendered
+The whole view is written with a single buffered write
+'''
+
+import html
+import sys
+from functools import lru_cache
+
+from export import parse_date
+from scheduling import time_to_minutes
+
+# Constants
+HTML_FILENAME = "schedule.html"
+GRID_SLOT_MINUTES = 30  # One grid column per half hour
+GRID_SYMBOLS = {"WORK": "W", "SLEEP": "S", "JOB_SEARCH": "J", "MEAL": "M",
+                "COMMUTE": "C", "PREP": "P", "SHOWER": "H"}
+GRID_FREE = "."
+
+_cache = {}  # (view, date) -> (shifts key, rendered text)
+
+@lru_cache(maxsize=None)
+def weekday_name(date):#"MM/DD/YYYY" -> "Monday", parsed once per date
+    return parse_date(date).strftime("%A")
+
+def shifts_key(shifts):#Hashable snapshot of a day's shifts, used as the cache key
+    return tuple((shift["type"], shift["start_time"], shift["end_time"]) for shift in shifts)
+
+def render_text_day(date, shifts):
+    lines = [f"\n{weekday_name(date)}, {date}:\n"]
+    if shifts:
+        lines.extend(f"  {shift['type']}: {shift['start_time']} - {shift['end_time']}\n" for shift in shifts)
+    else:
+        lines.append("  No shifts scheduled.\n")
+    return "".join(lines)
+
+def render_grid_day(date, shifts):
+    row = [GRID_FREE] * (24 * 60 // GRID_SLOT_MINUTES)
+    for shift in shifts:
+        start = time_to_minutes(shift["start_time"]) // GRID_SLOT_MINUTES
+        end = -(-time_to_minutes(shift["end_time"]) // GRID_SLOT_MINUTES)
+        if end <= start:  # Crosses midnight, fill to the end of the day
+            end = len(row)
+        row[start:end] = GRID_SYMBOLS.get(shift["type"], "?") * (end - start)
+    return f"{weekday_name(date)[:3]} {date[:5]} |{''.join(row)}|\n"
+
+def render_html_day(date, shifts):
+    items = "".join(
+        f"<li class=\"{html.escape(shift['type'].lower())}\">{html.escape(shift['type'])}: "
+        f"{html.escape(shift['start_time'])} - {html.escape(shift['end_time'])}</li>"
+        for shift in shifts) or "<li>No shifts scheduled.</li>"
+    return f"<tr><th>{weekday_name(date)}, {html.escape(date)}</th><td><ul>{items}</ul></td></tr>\n"
+
+VIEWS = {"text": render_text_day, "grid": render_grid_day, "html": render_html_day}
+
+def render_day(view, date, shifts):
+    """Return the cached rendering of one day, re-rendering only if its shifts changed."""
+    key = shifts_key(shifts)
+    cached = _cache.get((view, date))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    text = VIEWS[view](date, shifts)
+    _cache[(view, date)] = (key, text)
+    return text
+
+def render_schedule(schedule, view="text"):
+    """Render the whole schedule in one of VIEWS and return it as a single string."""
+    days = [render_day(view, date, shifts) for date, shifts in schedule.items()]
+    if view == "grid":
+        hours = "".join(f"{hour:<{60 // GRID_SLOT_MINUTES}}"[:60 // GRID_SLOT_MINUTES] for hour in range(0, 24))
+        legend = "  ".join(f"{symbol}={shift_type}" for shift_type, symbol in GRID_SYMBOLS.items())
+        return "\nWeekly Timeline:\n" + f"{'':9} |{hours}|\n" + "".join(days) + f"{legend}\n"
+    if view == "html":
+        return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Weekly Schedule</title></head>\n"
+                "<body><h1>Weekly Schedule</h1>\n<table>\n" + "".join(days) + "</table></body></html>\n")
+    return "\nWeekly Schedule:\n" + "".join(days)
+
+def display_schedule(schedule, view="text", out=None):
+    """Display the schedule with both the day of the week and the date, in a single write."""
+    out = out or sys.stdout
+    out.write(render_schedule(schedule, view))
+    out.flush()
+
+def save_html(schedule, filename=HTML_FILENAME):
+    """Write the HTML view of the schedule to a file."""
+    with open(filename, "w") as file:
+        file.write(render_schedule(schedule, "html"))
+
+def input_display(schedule):
+    """Ask which view to show, then display it (HTML is saved to a file)."""
+    view = input("View (text/grid/html) [text]: ").strip().lower() or "text"
+    if view == "html":
+        save_html(schedule)
+        print(f"Schedule saved to {HTML_FILENAME}.")
+    elif view in VIEWS:
+        display_schedule(schedule, view)
+    else:
+        print("Invalid view. Please try again.")
+    return schedule
@@ -10,10 +10,15 @@ Works success!
 import sys
 import vto
 import vet
-from scheduling import load_schedule, save_schedule, display_schedule, clean_schedule, optimize_schedule, display_hours
+import export
+import reminders
+import render
+import vetplan
+from scheduling import load_schedule, save_schedule, clean_schedule, optimize_schedule, display_hours, input_search_mode
 
 # Main loop
 schedule = load_schedule()#Schedule is dictionary where each key is a date (string)
+reminder_engine = None#Started from the menu
 
 while True:
     # Input
@@ -22,23 +27,52 @@ while True:
     print("2. Input VTO")
     print("3. Input VET")
     print("4. Display total job search hours")
-    print("5. Exit")
+    print("5. Export schedule (iCalendar/CSV)")
+    print("6. Start reminders")
+    print("7. Plan VET/VTO offers")
+    print("8. Choose job search mode (balanced/scored)")
+    print("9. Exit")
     choice = input("Enter your choice: ")
 
     # Processing
     if choice == "1":
-        display_schedule(schedule)  # Call the new display function
+        schedule=render.input_display(schedule)  # Text, timeline grid or HTML view
     elif choice == "2":
         schedule=clean_schedule(schedule)#Remove all non-work shifts
         schedule=vto.input_vto(schedule)# Input VTO 
         schedule=optimize_schedule(schedule)#Optimize schedule
+        if reminder_engine:
+            reminder_engine.update(schedule)#Replace only the reminders that changed
     elif choice == "3":
         schedule=clean_schedule(schedule)#Remove all non-work shifts
         schedule=vet.input_vet(schedule)# Input VET
         schedule=optimize_schedule(schedule)#Optimize schedule
+        if reminder_engine:
+            reminder_engine.update(schedule)#Replace only the reminders that changed
     elif choice == "4":
         display_hours(schedule)  # Display total job search hours
     elif choice == "5":
+        schedule=export.input_export(schedule)# Export to calendar files
+    elif choice == "6":
+        if reminder_engine is None:
+            reminder_engine = reminders.ReminderEngine()
+            reminder_engine.update(schedule)
+            reminder_engine.start_in_thread()
+            print("Reminders started.")
+        else:
+            print("Reminders are already running.")
+    elif choice == "7":
+        schedule=vetplan.input_offers(schedule)# Pick the best subset of offers, returns a cleaned schedule
+        schedule=optimize_schedule(schedule)#Optimize schedule
+        if reminder_engine:
+            reminder_engine.update(schedule)#Replace only the reminders that changed
+    elif choice == "8":
+        input_search_mode()# Saved, used by every later optimization
+        schedule=clean_schedule(schedule)#Remove all non-work shifts
+        schedule=optimize_schedule(schedule)#Re-optimize with the chosen mode
+        if reminder_engine:
+            reminder_engine.update(schedule)#Replace only the reminders that changed
+    elif choice == "9":
         save_schedule(schedule)  # Save before exiting
         print("Exiting scheduler...")
         break
@@ -3,11 +3,20 @@ schedule.py
 Handles schedule loading, saving, and cleaning.
 '''
 
+import hashlib
 import json
 import os
 from datetime import datetime, timedelta
 import re
 from collections import defaultdict, deque
+from functools import lru_cache
+from sleepdebt import load_sleep_debt, save_sleep_debt
+from memo import memo_get, memo_put
+
+try:
+    import numpy as np  # Only needed for the "scored" job search mode
+except ImportError:
+    np = None
 
 # Constants
 FILENAME = "schedule.json"
@@ -15,6 +24,21 @@ DEFAULT_WORK_DAYS = ["Saturday", "Sunday", "Monday", "Tuesday", "Wednesday"]
 DEFAULT_SHIFT = {"type": "WORK", "start_time": "03:00 AM", "end_time": "11:30 AM"}
 PREP_TIME = timedelta(minutes=45)
 COMMUTE_TIME = timedelta(minutes=15)
+JOB_SEARCH_GOAL = 40 * 60  # 40 hours per week, in minutes
+MIN_SLEEP = 6.5 * 60  # Minimum sleep in minutes
+OPTIMIZER_VERSION = 4  # Bump when the optimizer changes, so cached results from the old one are not reused
+SEARCH_MODE = "balanced"  # Default "balanced" or "scored", see optimize_search; the menu choice is kept in SETTINGS_FILENAME
+SETTINGS_FILENAME = "settings.json"
+SLOT_MINUTES = 30  # Slot size of the scored job search mode
+SEARCH_BALANCE_TOLERANCE = 2 * 60  # Most minutes a day may move away from its equal share in the scored mode
+SEARCH_BALANCE_SHARE = 0.5  # ...and at most this fraction of the share, so small shares are not dropped
+# Job search preference for the scored mode, higher is better. Each list is indexed by hours, the last value repeats
+SEARCH_PREFERENCES = {
+    "time_of_day": [-3, -3, -3, -3, -3, -3, -1, 0, 3, 3, 3, 3,  # Midnight to 11 AM
+                    2, 2, 2.5, 2.5, 2.5, 2.5, 1.5, 1.5, 1.5, 0, -2, -2],  # Noon to 11 PM
+    "since_wake": [0.5, 1.5, 2, 2, 2, 1.5, 1.5, 1, 1, 0.5, 0.5, 0, 0, -0.5, -1, -1.5, -2],
+    "since_work": [-2, -1.5, -1, -0.5, 0],
+}
 
 #Functions
 def convert_to_datetime(time_str):
@@ -27,6 +51,145 @@ def convert_to_datetime(time_str):
 def format_time(dt):
     return dt.strftime("%I:%M %p").replace("00:", "12:")
 
+def time_to_minutes(time_str):#Minutes since midnight, without going through strptime
+    match = re.match(r'(\d{1,2}):(\d{2})\s*(AM|PM)', time_str.strip())
+    if not match:
+        raise ValueError(f"Invalid time format: {time_str}")
+    hour = int(match.group(1)) % 12  # 12 AM (and the odd '00:xx AM') is hour 0
+    if match.group(3).upper() == "PM":
+        hour += 12
+    return hour * 60 + int(match.group(2))
+
+def free_intervals(shifts, day_end="11:50 PM", carried=0):
+    '''
+    Free (start, end) intervals of one day in minutes since midnight, up to day_end
+    A shift running past midnight is busy until the end of the day
+    carried is the minute a shift from the day before runs until, the day is busy up to it
+    '''
+    busy = [(0, carried)] if carried else []
+    for shift in shifts:
+        start, end = time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"])
+        busy.append((start, end if end > start else 24 * 60))
+    busy.sort()
+
+    free = []
+    last_end = 0
+    limit = time_to_minutes(day_end)
+    for start, end in busy:
+        if last_end < min(start, limit):
+            free.append((last_end, min(start, limit)))
+        last_end = max(last_end, end)
+    if last_end < limit:
+        free.append((last_end, limit))
+    return free
+
+@lru_cache(maxsize=None)
+def shift_date(date, days):#"MM/DD/YYYY" moved by a number of days, parsed once per date
+    return (datetime.strptime(date, "%m/%d/%Y") + timedelta(days=days)).strftime("%m/%d/%Y")
+
+def shift_minutes(shift):#Length of a shift in minutes, a shift past midnight counts for the day it starts
+    return (time_to_minutes(shift["end_time"]) - time_to_minutes(shift["start_time"])) % (24 * 60)
+
+class Schedule(dict):
+    '''
+    The schedule dictionary (dates -> lists of shifts) with a summary index kept alongside it
+        minutes[date][type] - total minutes of each shift type on that day
+        free[date] - free intervals of that day (see free_intervals), computed when first asked for
+    Assigning a whole day re-indexes that day; add_shifts and trim_shift update the index in O(1) per shift
+    Any change drops the cached free intervals of the day and the day after (a shift may run past midnight into it)
+    Editing a day's list in place bypasses the index, so shifts must be changed through those methods
+    '''
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.minutes = {}
+        self.free = {}
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, date, shifts):
+        super().__setitem__(date, shifts)
+        self.minutes[date] = {}
+        self._forget_free(date)
+        for shift in shifts:
+            self._count(date, shift, 1)
+
+    def __delitem__(self, date):
+        super().__delitem__(date)
+        del self.minutes[date]
+        self._forget_free(date)
+
+    def update(self, *args, **kwargs):
+        for date, shifts in dict(*args, **kwargs).items():
+            self[date] = shifts
+
+    def _count(self, date, shift, sign):#Add (sign=1) or remove (sign=-1) one shift from the index
+        duration = sign * shift_minutes(shift)
+        day = self.minutes[date]
+        day[shift["type"]] = day.get(shift["type"], 0) + duration
+        self._forget_free(date)
+
+    def _forget_free(self, date):#Drop cached free intervals a change to date can affect
+        self.free.pop(date, None)
+        self.free.pop(shift_date(date, 1), None)
+
+    def add_shifts(self, date, shifts, position=None):
+        """Add shifts to a day, at the end or inserted at position."""
+        if position is None:
+            self[date].extend(shifts)
+        else:
+            self[date][position:position] = shifts
+        for shift in shifts:
+            self._count(date, shift, 1)
+
+    def trim_shift(self, date, shift, end_time):
+        """Move the end of a shift that is already on the day."""
+        self._count(date, shift, -1)
+        shift["end_time"] = end_time
+        self._count(date, shift, 1)
+
+    def minutes_of(self, date, shift_type):
+        """Total minutes of shift_type on date."""
+        return self.minutes.get(date, {}).get(shift_type, 0)
+
+    def free_intervals_of(self, date):
+        """Free (start, end) intervals of a day in minutes, with overlapping shifts and the day before's late shifts accounted for."""
+        if date not in self.free:
+            carried = 0
+            for shift in self.get(shift_date(date, -1), []):
+                start, end = time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"])
+                if end < start:
+                    carried = max(carried, end)
+            self.free[date] = free_intervals(self.get(date, []), carried=carried)
+        return self.free[date]
+
+def load_settings():
+    """Load the saved settings, or an empty dictionary."""
+    if not os.path.exists(SETTINGS_FILENAME):
+        return {}
+    with open(SETTINGS_FILENAME, "r") as file:
+        return json.load(file)
+
+def save_settings(settings):
+    """Save the settings to file."""
+    with open(SETTINGS_FILENAME, "w") as file:
+        json.dump(settings, file, indent=4)
+
+def get_search_mode():#Job search mode chosen in the menu, or the default
+    return load_settings().get("search_mode", SEARCH_MODE)
+
+def input_search_mode():
+    """Ask for the job search mode and save it."""
+    mode = input("Job search mode (balanced/scored): ").strip().lower()
+    if mode not in ("balanced", "scored"):
+        print("Invalid mode. Please try again.")
+        return
+    settings = load_settings()
+    settings["search_mode"] = mode
+    save_settings(settings)
+    print(f"Job search mode set to {mode}.")
+
+def as_schedule(schedule):#Wrap a plain dictionary so it carries the summary index
+    return schedule if isinstance(schedule, Schedule) else Schedule(schedule)
+
 def get_current_week():
     """Get a dictionary with the current week's days, including default work shifts."""
     today = datetime.today()
@@ -39,7 +202,7 @@ def get_current_week():
         day_label = date_obj.strftime("%m/%d/%Y")  # Now using only date format
         week_schedule[day_label] = [DEFAULT_SHIFT.copy()] if date_obj.strftime("%A") in DEFAULT_WORK_DAYS else []
 
-    return week_schedule
+    return Schedule(week_schedule)
 
 def load_schedule():
     """Load schedule from file, or create a new one if missing."""
@@ -49,7 +212,8 @@ def load_schedule():
         save_schedule(schedule)
     else:
         with open(FILENAME, "r") as file:
-            schedule = json.load(file)
+            schedule = Schedule(json.load(file))
+        update_sleep_debt(schedule)  # Record past days before they are dropped
         schedule = clean_old_days(schedule)
     return schedule
 
@@ -72,20 +236,7 @@ def clean_old_days(schedule):
             updated_schedule[day].append(DEFAULT_SHIFT.copy())
 
     save_schedule(updated_schedule)
-    return updated_schedule
-
-def display_schedule(schedule):
-    """Display the schedule with both the day of the week and the date."""
-    print("\nWeekly Schedule:")
-    for day, shifts in schedule.items():
-        # Get the weekday name (e.g., Saturday) and format it with the date
-        day_of_week = datetime.strptime(day, "%m/%d/%Y").strftime("%A")
-        print(f"\n{day_of_week}, {day}:")  # Display day of week and date
-        if shifts:
-            for shift in shifts:
-                print(f"  {shift['type']}: {shift['start_time']} - {shift['end_time']}")
-        else:
-            print("  No shifts scheduled.")
+    return Schedule(updated_schedule)
 
 def clean_schedule(schedule):
     """Remove all non-WORK shifts from today onward."""
@@ -99,21 +250,71 @@ def clean_schedule(schedule):
             # Keep past days unchanged
             cleaned_schedule[day] = shifts
 
-    return cleaned_schedule
+    return Schedule(cleaned_schedule)
 
 def optimize_schedule(schedule):
     '''
     Possible shift types: WORK, MEAL, SLEEP, COMMUTE, JOB SEARCH, SHOWER, PREP
     '''
-    schedule=optimize_sleep(schedule)
-    schedule=optimize_search(schedule)
+    schedule=as_schedule(schedule)
+    ledger=update_sleep_debt(schedule)#Sleep debt carried over from past days
+    today = datetime.today().strftime("%m/%d/%Y")#Get current day
+
+    # Same week as one optimized before (e.g. a VTO toggled on and back off), reuse that result
+    key=optimize_key(schedule, ledger)
+    cached=memo_get(key)
+    if cached is not None:
+        schedule.update(cached)
+        return schedule
 
+    schedule=optimize_sleep(schedule, ledger)
+    schedule=optimize_search(schedule, ledger=ledger)
+
+    memo_put(key, {date: shifts for date, shifts in schedule.items() if date >= today})
     return schedule
 
-def optimize_sleep(schedule):#Assign mandatory shifts and sleep
+def optimize_key(schedule, ledger):
+    '''
+    Canonical hash of everything optimize_schedule depends on:
+    the WORK intervals of every day, any other shifts already on days from today, the job search time already spent,
+    today's date, the sleep-debt state and the optimizer config
+    '''
+    today = datetime.today().strftime("%m/%d/%Y")
+    days = []
+    for date in sorted(schedule.keys()):
+        shifts = schedule[date] if date >= today else [shift for shift in schedule[date] if shift["type"] == "WORK"]
+        days.append([date, [[shift["type"], time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"])]
+                            for shift in shifts]])
+    state = {
+        "version": OPTIMIZER_VERSION,
+        "today": today,
+        "days": days,
+        "spent": search_minutes_spent(schedule),
+        "config": [JOB_SEARCH_GOAL, MIN_SLEEP, get_search_mode(), np is not None, SLOT_MINUTES,
+                   SEARCH_BALANCE_TOLERANCE, SEARCH_BALANCE_SHARE, SEARCH_PREFERENCES],
+        "sleep_debt": [ledger.reclaim_budget(), ledger.needs_nap()],
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+def update_sleep_debt(schedule):
+    """Record every past day not yet in the sleep-debt ledger, save it, and return the ledger."""
+    schedule = as_schedule(schedule)
+    today = datetime.today()
+    ledger = load_sleep_debt()
+    for date in sorted(schedule.keys(), key=lambda d: datetime.strptime(d, "%m/%d/%Y")):
+        has_sleep = schedule.minutes_of(date, "SLEEP") > 0  # Days never optimized have no sleep to count
+        if has_sleep and datetime.strptime(date, "%m/%d/%Y").date() < today.date():
+            ledger.record(date, schedule.minutes_of(date, "SLEEP"))
+    ledger.age_to(today.strftime("%m/%d/%Y"))  # Debt from days long gone must not count today
+    save_sleep_debt(ledger)
+    return ledger
+
+def optimize_sleep(schedule, ledger=None):#Assign mandatory shifts and sleep
     '''
     schedule is a dictionary with dates as keys, and lists of dictionaries as values
+    ledger is the SleepDebtLedger; when sleep debt is high the optional nap is scheduled even after a work day
     '''
+    schedule = as_schedule(schedule)
     today = datetime.today().strftime("%m/%d/%Y")#Get current day
 
     for i, (date,shifts) in enumerate(schedule.items()):#Iterate over each day in schedule
@@ -136,10 +337,10 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 work_end = work_shift['end_time']
                 
                 # Calculate the sleep shift (only if the previous day wasn't a work day)
-                if i == 0 or not any(shift['type'] == 'WORK' for shift in schedule[list(schedule.keys())[i - 1]]):
+                if i == 0 or not any(shift['type'] == 'WORK' for shift in schedule[list(schedule.keys())[i - 1]]) or (ledger and ledger.needs_nap()):
                     sleep_start = calculate_nap_start(work_start)  # Custom function to calculate sleep time
                     sleep_end = add_duration(sleep_start, 2)  # 2-hour nap
-                    shifts.insert(0, {'type': 'SLEEP', 'start_time': sleep_start, 'end_time': sleep_end})
+                    schedule.add_shifts(date, [{'type': 'SLEEP', 'start_time': sleep_start, 'end_time': sleep_end}], 0)
 
                 # Schedule PREP, COMMUTE, MEAL, SHOWER, and the second SLEEP shift
                 prep_start = add_duration(work_start, -1)  # 1 hour before work
@@ -163,7 +364,7 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 next_day_work = any(shift['type'] == 'WORK' for shift in schedule.get(next_day, []))
 
                 if next_day_work:  # Next day is a work day
-                    second_sleep_start = max(shower_end, '3:00 PM')  # Start after shower, or at 3 PM if later
+                    second_sleep_start = max(shower_end, '3:00 PM', key=convert_to_datetime)  # Start after shower, or at 3 PM if later
                     second_sleep_end = add_duration(second_sleep_start, 8)  # 8-hour sleep duration
                 else:  # Next day is not a work day
                     second_sleep_start = shower_end  # Start immediately after the shower
@@ -176,16 +377,16 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                     second_meal_end=second_meal_end[:-2]+'AM'
                     print(second_meal_end)
 
-                shifts.extend([
+                schedule.add_shifts(date, [
                     {'type': 'PREP', 'start_time': prep_start, 'end_time': prep_end},
                     {'type': 'COMMUTE', 'start_time': commute_to_start, 'end_time': commute_to_end},
                 ])
 
                 # Only add WORK if it's not already in shifts
                 if not any(shift['type'] == 'WORK' and shift['start_time'] == work_start for shift in shifts):
-                    shifts.append({'type': 'WORK', 'start_time': work_start, 'end_time': work_end})
+                    schedule.add_shifts(date, [{'type': 'WORK', 'start_time': work_start, 'end_time': work_end}])
 
-                shifts.extend([
+                schedule.add_shifts(date, [
                     {'type': 'COMMUTE', 'start_time': commute_from_start, 'end_time': commute_from_end},
                     {'type': 'MEAL', 'start_time': meal_start, 'end_time': meal_end},
                     {'type': 'SHOWER', 'start_time': shower_start, 'end_time': shower_end},
@@ -201,10 +402,10 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 last_work_end = work_shifts[-1]['end_time']
                 
                 # Calculate the optional nap before the first work shift (if needed)
-                if i == 0 or not any(shift['type'] == 'WORK' for shift in schedule[list(schedule.keys())[i - 1]]):
+                if i == 0 or not any(shift['type'] == 'WORK' for shift in schedule[list(schedule.keys())[i - 1]]) or (ledger and ledger.needs_nap()):
                     nap_start = calculate_nap_start(first_work_start)  # Calculate nap time
                     nap_end = add_duration(nap_start, 2)  # 2-hour nap
-                    shifts.insert(0, {'type': 'SLEEP', 'start_time': nap_start, 'end_time': nap_end})
+                    schedule.add_shifts(date, [{'type': 'SLEEP', 'start_time': nap_start, 'end_time': nap_end}], 0)
 
                 # Schedule PREP, COMMUTE for the first work shift (based on the first work shift's start time)
                 prep_start = add_duration(first_work_start, -1)  # 1 hour before the first work shift
@@ -213,8 +414,8 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 commute_to_start = add_duration(first_work_start, -0.25)  # 15 minutes before the first work shift
                 commute_to_end = add_duration(commute_to_start, 0.25)  # 15-minute commute
 
-                shifts.insert(0, {'type': 'PREP', 'start_time': prep_start, 'end_time': prep_end})
-                shifts.insert(1, {'type': 'COMMUTE', 'start_time': commute_to_start, 'end_time': commute_to_end})
+                schedule.add_shifts(date, [{'type': 'PREP', 'start_time': prep_start, 'end_time': prep_end}], 0)
+                schedule.add_shifts(date, [{'type': 'COMMUTE', 'start_time': commute_to_start, 'end_time': commute_to_end}], 1)
 
                 # Schedule WORK shifts (already in the schedule)
 
@@ -234,7 +435,7 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 next_day_work = any(shift['type'] == 'WORK' for shift in schedule.get(next_day, []))
 
                 if next_day_work:  # Next day is a work day
-                    second_sleep_start = max(shower_end, '3:00 PM')  # Start after shower, or at 3 PM if later
+                    second_sleep_start = max(shower_end, '3:00 PM', key=convert_to_datetime)  # Start after shower, or at 3 PM if later
                     second_sleep_end = add_duration(second_sleep_start, 8)  # 8-hour sleep duration
                 else:  # Next day is not a work day
                     second_sleep_start = shower_end  # Start immediately after the shower
@@ -246,7 +447,7 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
                 if second_meal_start[:2]=='11' and second_meal_start[-2:]=='PM':#Handles going into next day
                     second_meal_end=second_meal_end[:-2]+'AM'
 
-                shifts.extend([
+                schedule.add_shifts(date, [
                     {'type': 'COMMUTE', 'start_time': commute_from_start, 'end_time': commute_from_end},
                     {'type': 'MEAL', 'start_time': meal_start, 'end_time': meal_end},
                     {'type': 'SHOWER', 'start_time': shower_start, 'end_time': shower_end},
@@ -274,7 +475,7 @@ def optimize_sleep(schedule):#Assign mandatory shifts and sleep
             shower_end = "9:00 PM"
             
             # Add the shifts for non-work day
-            shifts.extend([
+            schedule.add_shifts(date, [
                 {'type': 'SLEEP', 'start_time': sleep_start, 'end_time': sleep_end},
                 {'type': 'MEAL', 'start_time': meal_breakfast_start, 'end_time': meal_breakfast_end},
                 {'type': 'MEAL', 'start_time': meal_lunch_start, 'end_time': meal_lunch_end},
@@ -340,22 +541,9 @@ def add_duration(start_time, duration):
     # Format the output correctly
     return f'{total_hour:02}:{total_minute:02} {period}'
 
-def optimize_search(schedule):#Optimize job search time
-    """
-    Assigns job search time (up to 40 hours per week) in 30-minute blocks while balancing time across days.
-    Merges consecutive job search blocks into longer sessions.
-    Ensures sleep is not reduced below 6.5 hours.
-    Only allocates job search time starting from today.
-    Considers job search time already allocated since the beginning of the week.
-    schedule is a dictionary with dates as keys, and lists of dictionaries as values
-    WORKS
-    """
-    job_search_goal = 40 * 60  # 40 hours in minutes
-    job_search_block = 30  # 30-minute intervals
-    min_sleep = 6.5 * 60  # Minimum sleep in minutes
-    
-    #Determine Remaining job search hours
+def search_minutes_spent(schedule):
     '''
+    Job search time (in minutes) already allocated earlier in the current week
     The goal is to dedicate 40 hours per week for job search
     Some time might already have been dedicated earlier in the week, so the remaining time might be less than 40 hours.
     The week always starts on Sunday
@@ -370,15 +558,34 @@ def optimize_search(schedule):#Optimize job search time
     # Track job search time already allocated
     total_job_search_allocated = 0
 
+    schedule = as_schedule(schedule)
     for date in schedule:
         if date >= week_start_str and date < today:  # Look at past days in the current week
-            for event in schedule[date]:
-                if event["type"] == "JOB_SEARCH":
-                    #start_time = datetime.strptime(event["start_time"], "%I:%M %p")
-                    #end_time = datetime.strptime(event["end_time"], "%I:%M %p")
-                    start_time = convert_to_datetime(event["start_time"])
-                    end_time = convert_to_datetime(event["end_time"])
-                    total_job_search_allocated += (end_time - start_time).seconds // 60  # Convert to minutes
+            total_job_search_allocated += schedule.minutes_of(date, "JOB_SEARCH")
+
+    return total_job_search_allocated
+
+def optimize_search(schedule, mode=None, ledger=None):#Optimize job search time
+    """
+    Assigns job search time (up to 40 hours per week) in 30-minute blocks while balancing time across days.
+    Merges consecutive job search blocks into longer sessions.
+    Ensures sleep is not reduced below 6.5 hours.
+    Only allocates job search time starting from today.
+    Considers job search time already allocated since the beginning of the week.
+    mode is "balanced" (earliest free gaps, round-robin over days) or "scored" (best slots by SEARCH_PREFERENCES), defaults to the mode chosen in the menu
+    ledger is the SleepDebtLedger; sleep is only cut while the rolling sleep debt stays under its limits
+    schedule is a dictionary with dates as keys, and lists of dictionaries as values
+    WORKS
+    """
+    job_search_goal = JOB_SEARCH_GOAL
+    job_search_block = 30  # 30-minute intervals
+    min_sleep = MIN_SLEEP
+    mode = mode or get_search_mode()
+    schedule = as_schedule(schedule)
+    
+    #Determine Remaining job search hours
+    today = datetime.today().strftime("%m/%d/%Y")#Get current day
+    total_job_search_allocated = search_minutes_spent(schedule)
     
     remaining_job_search_time = max(0, job_search_goal - total_job_search_allocated)
 
@@ -390,95 +597,19 @@ def optimize_search(schedule):#Optimize job search time
         return schedule
     
     # First pass: Assign job search time into available blocks
-    '''
-    Assign job search time in 30 minute intervals into any unoccupied time slots
-    Start from the current day
-    Balance it out between each day as much as possible.
-    Merge any adjacent blocks of job search time into one.
-    If there are multiple WORK shifts, DO NOT assign job search time in between them (I can only do job search time at home)
-    Make sure all blocks of time are ordered consecutively
-    Do not overlap into the next day
-    '''
-    # Step 1: Collect available blocks across all days starting from today
-    all_available_blocks = []
-    for date in sorted(schedule.keys()):
-        if date < today:
-            continue
-
-        busy_intervals = []
-        for event in schedule[date]:
-            start_time = convert_to_datetime(event["start_time"])
-            end_time = convert_to_datetime(event["end_time"])
-            busy_intervals.append((start_time, end_time))
-        busy_intervals.sort()
-
-        available_blocks = []
-        last_end_time = convert_to_datetime("12:00 AM")
-        for start, end in busy_intervals:
-            if last_end_time < start:
-                available_blocks.append((last_end_time, start))
-            last_end_time = max(last_end_time, end)
-
-        end_of_day = convert_to_datetime("11:50 PM")
-        if last_end_time < end_of_day:
-            available_blocks.append((last_end_time, end_of_day))
-
-        for start, end in available_blocks:
-            all_available_blocks.append((date, start, end))
-
-    # Step 2: Sort blocks by date to roughly balance across days
-    all_available_blocks.sort(key=lambda x: x[0])  # This naturally spreads by date
-
-    # Step 3: Assign job search time round-robin style across days
-    new_entries_by_date = {date: [] for date in schedule}
-    
-    # Group blocks by date
-    blocks_by_date = defaultdict(deque)
-    for date, start, end in all_available_blocks:
-        blocks_by_date[date].append((start, end))
-
-    date_queue = deque(sorted(blocks_by_date.keys()))  # round-robin through dates
-
-    while remaining_job_search_time > 0 and date_queue:
-        date = date_queue.popleft()
-        blocks = blocks_by_date[date]
-
-        while blocks and remaining_job_search_time > 0:
-            start, end = blocks[0]
-            if (end - start).seconds // 60 >= job_search_block:
-                new_end = start + timedelta(minutes=job_search_block)
-
-                # Merge with previous if possible
-                entries = new_entries_by_date[date]
-                if entries and entries[-1]["type"] == "JOB_SEARCH" and entries[-1]["end_time"] == format_time(start):
-                    entries[-1]["end_time"] = format_time(new_end)
-                else:
-                    entries.append({
-                        "type": "JOB_SEARCH",
-                        "start_time": format_time(start),
-                        "end_time": format_time(new_end)
-                    })
-
-                # Update block in queue
-                blocks[0] = (new_end, end)
-                remaining_job_search_time -= job_search_block
-                break  # move to next date after one block assigned
-            else:
-                blocks.popleft()  # discard unusable block
-
-        if blocks:  # still has time blocks left
-            date_queue.append(date)
-
-    # Step 4: Append to schedule and sort
-    for date in new_entries_by_date:
-        schedule[date].extend(new_entries_by_date[date])
-        schedule[date].sort(key=lambda x: convert_to_datetime(x["start_time"]))
+    if mode == "scored" and np is not None:
+        remaining_job_search_time = assign_search_scored(schedule, today, remaining_job_search_time, job_search_block)
+    else:
+        if mode == "scored":
+            print("NumPy is not installed, falling back to balanced job search assignment")
+        remaining_job_search_time = assign_search_balanced(schedule, today, remaining_job_search_time, job_search_block)
     
     # Second pass: Reclaim sleep time if necessary
     '''
     If not all the required job search time has been allocated, start reducing sleep time and reassigning it
     Start from the current day
     Each SLEEP shift can be reduced to a mimimum of 6.5 hours
+    Stop once the cuts would push the rolling sleep debt (from the ledger) over its limit
     Try to balance it out between days as much as possible.
     If after reducing sleep as much as possible, and there is still job search time to assign, that's okay, it was the best we could do.
     '''
@@ -489,8 +620,8 @@ def optimize_search(schedule):#Optimize job search time
         # Collect all sleep blocks with metadata
         sleep_blocks = []
         for date in sorted(schedule.keys()):
-            if date < today:
-                continue
+            if date < today or schedule.minutes_of(date, "SLEEP") <= min_sleep:
+                continue  # Past day, or not enough sleep on the day for any block to be cut
             for i, event in enumerate(schedule[date]):
                 if event["type"] == "SLEEP":
                     start = convert_to_datetime(event["start_time"])
@@ -508,11 +639,16 @@ def optimize_search(schedule):#Optimize job search time
         # Sort sleep blocks: longest first, then earlier dates
         sleep_blocks.sort(key=lambda x: (-x["duration"], x["date"]))
 
+        # Sleep that may still be cut before the debt limit is reached
+        reclaim_budget = ledger.reclaim_budget() if ledger else float("inf")
+        if reclaim_budget < job_search_block:
+            print("Sleep debt is already high, not reducing sleep")
+
         # Begin reducing in 30 min chunks
         while remaining_job_search_time > 0:
             made_change = False
             for block in sleep_blocks:
-                if remaining_job_search_time <= 0:
+                if remaining_job_search_time <= 0 or reclaim_budget < job_search_block:
                     break
                 if block["duration"] - job_search_block < min_sleep:
                     continue  # Skip if this reduction would go below 6.5h
@@ -521,7 +657,7 @@ def optimize_search(schedule):#Optimize job search time
                 block["end"] -= timedelta(minutes=job_search_block)
                 block["duration"] -= job_search_block
                 event = schedule[block["date"]][block["index"]]
-                event["end_time"] = format_time(block["end"])
+                schedule.trim_shift(block["date"], event, format_time(block["end"]))
 
                 # Insert job search immediately after
                 job_search_start = block["end"]
@@ -531,10 +667,11 @@ def optimize_search(schedule):#Optimize job search time
                     "start_time": format_time(job_search_start),
                     "end_time": format_time(job_search_end)
                 }
-                schedule[block["date"]].append(job_search_event)
+                schedule.add_shifts(block["date"], [job_search_event])
 
                 # Update state
                 remaining_job_search_time -= job_search_block
+                reclaim_budget -= job_search_block
                 made_change = True
 
             if not made_change:
@@ -549,11 +686,182 @@ def optimize_search(schedule):#Optimize job search time
     
     return schedule
 
+def assign_search_balanced(schedule, today, remaining_job_search_time, job_search_block):
+    '''
+    First pass of optimize_search: fills the earliest free gaps of each day, one block per day in turn
+    Assign job search time in 30 minute intervals into any unoccupied time slots
+    Start from the current day
+    Balance it out between each day as much as possible.
+    Merge any adjacent blocks of job search time into one.
+    If there are multiple WORK shifts, DO NOT assign job search time in between them (I can only do job search time at home)
+    Make sure all blocks of time are ordered consecutively
+    Do not overlap into the next day
+    Returns the job search time (in minutes) that could not be assigned
+    '''
+    # Step 1: Collect available blocks across all days starting from today
+    all_available_blocks = []
+    for date in sorted(schedule.keys()):
+        if date < today:
+            continue
+
+        midnight = convert_to_datetime("12:00 AM")
+        for start, end in schedule.free_intervals_of(date):  # Free gaps up to 11:50 PM, from the index
+            all_available_blocks.append((date, midnight + timedelta(minutes=start), midnight + timedelta(minutes=end)))
+
+    # Step 2: Sort blocks by date to roughly balance across days
+    all_available_blocks.sort(key=lambda x: x[0])  # This naturally spreads by date
+
+    # Step 3: Assign job search time round-robin style across days
+    new_entries_by_date = {date: [] for date in schedule}
+    
+    # Group blocks by date
+    blocks_by_date = defaultdict(deque)
+    for date, start, end in all_available_blocks:
+        blocks_by_date[date].append((start, end))
+
+    date_queue = deque(sorted(blocks_by_date.keys()))  # round-robin through dates
+
+    while remaining_job_search_time > 0 and date_queue:
+        date = date_queue.popleft()
+        blocks = blocks_by_date[date]
+
+        while blocks and remaining_job_search_time > 0:
+            start, end = blocks[0]
+            if (end - start).seconds // 60 >= job_search_block:
+                new_end = start + timedelta(minutes=job_search_block)
+
+                # Merge with previous if possible
+                entries = new_entries_by_date[date]
+                if entries and entries[-1]["type"] == "JOB_SEARCH" and entries[-1]["end_time"] == format_time(start):
+                    entries[-1]["end_time"] = format_time(new_end)
+                else:
+                    entries.append({
+                        "type": "JOB_SEARCH",
+                        "start_time": format_time(start),
+                        "end_time": format_time(new_end)
+                    })
+
+                # Update block in queue
+                blocks[0] = (new_end, end)
+                remaining_job_search_time -= job_search_block
+                break  # move to next date after one block assigned
+            else:
+                blocks.popleft()  # discard unusable block
+
+        if blocks:  # still has time blocks left
+            date_queue.append(date)
+
+    # Step 4: Append to schedule and sort
+    for date in new_entries_by_date:
+        schedule.add_shifts(date, new_entries_by_date[date])
+        schedule[date].sort(key=lambda x: convert_to_datetime(x["start_time"]))
+
+    return remaining_job_search_time
+
+def assign_search_scored(schedule, today, remaining_job_search_time, job_search_block):
+    '''
+    First pass of optimize_search in "scored" mode
+    Builds a days x slots score matrix from SEARCH_PREFERENCES (time of day, hours since waking, hours since work)
+    Each day starts from the share of blocks the balanced mode would give it (round-robin over free slots)
+    and may move up to SEARCH_BALANCE_TOLERANCE (and SEARCH_BALANCE_SHARE of the share) away from it,
+    so a low scoring slot on one day can give way to a better one
+    on another; the best slots are then picked with argpartition, all days at once
+    Returns the job search time (in minutes) that could not be assigned
+    '''
+    dates = sorted(date for date in schedule if date >= today)
+    if not dates:
+        return remaining_job_search_time
+
+    slots_per_day = 24 * 60 // SLOT_MINUTES
+    slot_start = np.arange(slots_per_day) * SLOT_MINUTES
+    day_end = time_to_minutes("11:50 PM")  # Do not overlap into the next day
+
+    # Busy slots, and the times sleep/work last ended before each slot (-1 if not yet today)
+    busy = np.ones((len(dates), slots_per_day), dtype=bool)
+    wake_marks = np.full((len(dates), slots_per_day + 1), -1)
+    work_marks = np.full((len(dates), slots_per_day + 1), -1)
+    for d, date in enumerate(dates):
+        for start, end in schedule.free_intervals_of(date):  # Slots lying wholly inside a free interval are free
+            busy[d, -(-start // SLOT_MINUTES):end // SLOT_MINUTES] = False
+        for event in schedule[date]:
+            start, end = time_to_minutes(event["start_time"]), time_to_minutes(event["end_time"])
+            if end < start:
+                continue  # Crosses midnight
+            marks = wake_marks if event["type"] == "SLEEP" else work_marks if event["type"] == "WORK" else None
+            if marks is not None:
+                column = -(-end // SLOT_MINUTES)  # First slot starting at or after the end
+                marks[d, column] = max(marks[d, column], end)
+    wake = np.maximum.accumulate(wake_marks, axis=1)[:, :slots_per_day]
+    work = np.maximum.accumulate(work_marks, axis=1)[:, :slots_per_day]
+
+    def curve(name, hours):#Look up a preference curve, repeating its last value
+        values = np.asarray(SEARCH_PREFERENCES[name], dtype=float)
+        return values[np.clip(hours, 0, len(values) - 1)]
+
+    hours_since_wake = np.where(wake >= 0, (slot_start - wake) // 60, len(SEARCH_PREFERENCES["since_wake"]))
+    hours_since_work = np.where(work >= 0, (slot_start - work) // 60, len(SEARCH_PREFERENCES["since_work"]))
+    scores = (curve("time_of_day", slot_start // 60)[None, :]
+              + curve("since_wake", hours_since_wake)
+              + curve("since_work", hours_since_work))
+
+    feasible = ~busy & (slot_start + SLOT_MINUTES <= day_end)[None, :]
+    scores = np.where(feasible, scores, -np.inf)
+
+    # Per-day quota: the share round-robin assignment would give each day (earlier days take the remainder)
+    capacity = feasible.sum(axis=1)
+    needed = -(-remaining_job_search_time // SLOT_MINUTES)
+    needed = min(needed, int(capacity.sum()))
+    quota = np.zeros(len(dates), dtype=int)
+    if needed > 0:
+        levels = np.arange(1, capacity.max() + 1)
+        filled = np.minimum(capacity[None, :], levels[:, None]).sum(axis=1)
+        level = int(levels[np.searchsorted(filled, needed)])  # First full round that covers the need
+        quota = np.minimum(capacity, level - 1)
+        extra = needed - int(quota.sum())
+        takers = np.flatnonzero(capacity >= level)[:extra]
+        quota[takers] += 1
+
+    # Each day may move up to SEARCH_BALANCE_TOLERANCE away from its quota when better slots are elsewhere,
+    # but by no more than SEARCH_BALANCE_SHARE of it, so every day with a share keeps part of it
+    tolerance = np.minimum(SEARCH_BALANCE_TOLERANCE // SLOT_MINUTES, (quota * SEARCH_BALANCE_SHARE).astype(int))
+    floor = quota - tolerance
+    cap = np.minimum(quota + tolerance, capacity)
+
+    # Rank of every slot within its day, best first (infeasible slots rank last)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(slots_per_day)[None, :].repeat(len(dates), axis=0), axis=1)
+
+    # Every day keeps its top floor slots, the rest of the need goes to the best slots under each day's cap
+    chosen = rank < floor[:, None]
+    extra = needed - int(chosen.sum())
+    if extra > 0:
+        optional = np.where(~chosen & (rank < cap[:, None]), scores, -np.inf).ravel()
+        picks = np.argpartition(-optional, extra - 1)[:extra]
+        chosen.ravel()[picks] = True
+
+    # Merge chosen runs of slots into JOB_SEARCH shifts
+    edges = np.diff(np.pad(chosen.astype(int), ((0, 0), (1, 1))), axis=1)
+    for d, date in enumerate(dates):
+        starts = np.flatnonzero(edges[d] == 1)
+        ends = np.flatnonzero(edges[d] == -1)
+        for first, last in zip(starts, ends):
+            schedule.add_shifts(date, [{
+                "type": "JOB_SEARCH",
+                "start_time": format_time(datetime(1900, 1, 1) + timedelta(minutes=int(first) * SLOT_MINUTES)),
+                "end_time": format_time(datetime(1900, 1, 1) + timedelta(minutes=int(last) * SLOT_MINUTES))
+            }])
+        schedule[date].sort(key=lambda x: convert_to_datetime(x["start_time"]))
+
+    assigned = int(chosen.sum()) * SLOT_MINUTES
+    return max(0, remaining_job_search_time - assigned)
+
 def optimize_free(schedule):#Optimize free time (Do I even need this?)
     return schedule
 
 def display_hours(schedule):#Displays the total job search hours
     total_job_search_time=0#Total job search time for the week (in hours)
+    schedule=as_schedule(schedule)
 
     today = datetime.today().strftime("%m/%d/%Y")#Get current day
     today_dt = datetime.strptime(today, "%m/%d/%Y")
@@ -567,14 +875,8 @@ def display_hours(schedule):#Displays the total job search hours
         date_str = date_dt.strftime("%m/%d/%Y")
 
         if date_str in schedule:
-            daily_job_search_time = 0  # Job search time for the day
-            for event in schedule[date_str]:
-                if event["type"] == "JOB_SEARCH":
-                    start_time = convert_to_datetime(event["start_time"])
-                    end_time = convert_to_datetime(event["end_time"])
-                    duration = (end_time - start_time).seconds // 60  # Duration in minutes
-                    daily_job_search_time += duration
-                    total_job_search_time += duration
+            daily_job_search_time = schedule.minutes_of(date_str, "JOB_SEARCH")  # Job search time for the day
+            total_job_search_time += daily_job_search_time
 
             day_name = date_dt.strftime("%A")  # e.g., "Monday"
             print(f"{day_name} ({date_str}): {daily_job_search_time / 60:.2f} hr")
@@ -0,0 +1,94 @@
+'''
+sleepdebt.py
+Keeps a rolling sleep-debt ledger across weeks (actual sleep vs target over the last 7 and 14 days)
+Each recorded day updates every window in O(1), so history is never recomputed
+'''
+
+import json
+import os
+from collections import deque
+from datetime import datetime, timedelta
+
+# Constants
+SLEEP_DEBT_FILENAME = "sleep_debt.json"
+# optimize_sleep's own routine averages about 7.25h a day (8h nights, one ~4.75h day before a day off),
+# so a 7h target keeps an uncut week at no debt, while reclaiming every night down to 6.5h adds about 4.5h a week
+TARGET_SLEEP = 7 * 60  # Target sleep per day in minutes
+DEBT_LIMITS = {7: 4 * 60, 14: 6 * 60}  # Window size in days -> debt (minutes) at which sleep is no longer cut
+NAP_DEBT = 3 * 60  # 7-day debt (minutes) at which the optional nap is always taken
+
+class SleepDebtLedger:
+    '''
+    Rolling windows of daily sleep deficit (target - actual, in minutes)
+    Each window is a deque of the last N deficits and their running sum
+    Days must be recorded in date order; a day at or before the last recorded one is ignored
+    Days skipped between two recorded days count as on target, so old debt still ages out of the windows
+    '''
+    def __init__(self, windows=DEBT_LIMITS, target=TARGET_SLEEP):
+        self.target = target
+        self.windows = {size: deque() for size in windows}
+        self.sums = {size: 0 for size in windows}
+        self.last_date = None  # Last recorded date, "MM/DD/YYYY"
+
+    def record(self, date, sleep_minutes):
+        """Add one day of actual sleep. Returns False if the day was already recorded."""
+        if self.last_date is not None and datetime.strptime(date, "%m/%d/%Y") <= datetime.strptime(self.last_date, "%m/%d/%Y"):
+            return False
+
+        self.age_to(date)  # Unrecorded days in between
+        self._push(self.target - sleep_minutes)
+        self.last_date = date
+        return True
+
+    def _push(self, deficit):#Slide every window forward by one day
+        for size, window in self.windows.items():
+            window.append(deficit)
+            self.sums[size] += deficit
+            if len(window) > size:
+                self.sums[size] -= window.popleft()
+
+    def debt(self, size=7):
+        """Sleep debt in minutes over the last size days (surplus sleep pays it back, never below 0)."""
+        return max(0, self.sums[size])
+
+    def reclaim_budget(self):
+        """Minutes of sleep the optimizer may still cut before any window reaches its debt limit."""
+        return max(0, min(limit - self.debt(size) for size, limit in DEBT_LIMITS.items() if size in self.windows))
+
+    def needs_nap(self):
+        """True if enough debt has built up that the optional nap should always be scheduled."""
+        return self.debt(7) >= NAP_DEBT
+
+    def age_to(self, date):
+        """Slide the windows up to the day before date, counting unrecorded days as on target."""
+        if self.last_date is None:
+            return
+        gap = (datetime.strptime(date, "%m/%d/%Y") - datetime.strptime(self.last_date, "%m/%d/%Y")).days
+        for _ in range(min(max(gap - 1, 0), max(self.windows))):
+            self._push(0)
+        if gap > 1:
+            self.last_date = (datetime.strptime(date, "%m/%d/%Y") - timedelta(days=1)).strftime("%m/%d/%Y")
+
+    def to_dict(self):
+        largest = max(self.windows)
+        return {"last_date": self.last_date, "deficits": list(self.windows[largest])}
+
+    @classmethod
+    def from_dict(cls, data):
+        ledger = cls()
+        for deficit in data.get("deficits", []):  # Replay the stored deficits to rebuild every window
+            ledger._push(deficit)
+        ledger.last_date = data.get("last_date")
+        return ledger
+
+def load_sleep_debt():
+    """Load the ledger from file, or start an empty one."""
+    if not os.path.exists(SLEEP_DEBT_FILENAME):
+        return SleepDebtLedger()
+    with open(SLEEP_DEBT_FILENAME, "r") as file:
+        return SleepDebtLedger.from_dict(json.load(file))
+
+def save_sleep_debt(ledger):
+    """Save the ledger to file."""
+    with open(SLEEP_DEBT_FILENAME, "w") as file:
+        json.dump(ledger.to_dict(), file, indent=4)
@@ -0,0 +1,69 @@
+'''
+test_vetplan.py
+Checks that the offers plan_offers accepts keep the sleep floor once the routine is rebuilt around them
+'''
+
+import contextlib
+import copy
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+import vetplan
+from scheduling import MIN_SLEEP, Schedule, optimize_sleep
+
+WORK_SHIFT = {"type": "WORK", "start_time": "03:00 AM", "end_time": "11:30 AM"}
+
+@pytest.fixture
+def week(tmp_path, monkeypatch):
+    """Seven days from today: work, work, work, off, off, work, work."""
+    monkeypatch.chdir(tmp_path)  # Keep the sleep debt file out of the repo
+    today = datetime.today()
+    dates = [(today + timedelta(days=i)).strftime("%m/%d/%Y") for i in range(7)]
+    worked = [True, True, True, False, False, True, True]
+    return dates, Schedule({date: [dict(WORK_SHIFT)] if work else [] for date, work in zip(dates, worked)})
+
+def routine_sleep(schedule, offers):#Effective sleep per day after applying offers and rebuilding the routine
+    days = Schedule(copy.deepcopy(dict(schedule)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        vetplan.apply_offers(days, offers)
+        optimize_sleep(days)
+    return {date: vetplan.effective_sleep(shifts) for date, shifts in days.items()}
+
+def offer(kind, date, start_time, end_time):
+    return {"kind": kind, "date": date, "start_time": start_time, "end_time": end_time}
+
+def test_accepted_offers_keep_sleep(week):
+    dates, schedule = week
+    offers = [offer("VET", dates[0], "11:30 AM", "01:30 PM"),
+              offer("VET", dates[1], "03:00 PM", "05:00 PM"),
+              offer("VET", dates[3], "10:30 AM", "12:30 PM"),
+              offer("VET", dates[4], "02:00 PM", "06:00 PM"),
+              offer("VTO", dates[2], "09:30 AM", "11:30 AM"),
+              offer("VET", dates[6], "11:30 AM", "12:30 PM")]
+    accepted, paid = vetplan.plan_offers(schedule, offers)
+    assert accepted
+
+    before = routine_sleep(schedule, [])
+    after = routine_sleep(schedule, accepted)
+    for date in dates[:-1]:  # The last day's routine depends on a day outside the schedule
+        assert after[date] >= min(MIN_SLEEP, before[date]), date
+
+def test_rejects_vet_that_breaks_next_day(week):
+    dates, schedule = week
+    accepted, paid = vetplan.plan_offers(schedule, [offer("VET", dates[4], "02:00 PM", "06:00 PM")])
+    assert accepted == []
+    assert paid == 0
+
+def test_vto_can_win_back_sleep_for_a_vet(week):
+    dates, schedule = week
+    del schedule[dates[6]]  # End on the work day after the off days, as the default week does
+    vet_offer = offer("VET", dates[4], "01:00 PM", "04:00 PM")
+    vto_offer = offer("VTO", dates[5], "09:30 AM", "11:30 AM")
+    assert vetplan.plan_offers(schedule, [vet_offer]) == ([], 0)
+    assert vetplan.plan_offers(schedule, [vet_offer, vto_offer]) == ([vet_offer, vto_offer], 60)
+
+def test_parse_offer_normalizes_times():
+    assert vetplan.parse_offer("VET 10/21/2026 2:00PM - 6:00pm") == offer("VET", "10/21/2026", "02:00 PM", "06:00 PM")
+    assert vetplan.parse_offer("VET 10/21/2026 13:00 PM - 6:00 PM") is None
@@ -59,6 +59,10 @@ def input_vet(schedule):
     vet_start_time = input("Enter VET start time (HH:MM AM/PM): ")
     vet_end_time = input("Enter VET end time (HH:MM AM/PM): ")
 
+    return apply_vet(schedule, input_date, vet_start_time, vet_end_time)
+
+def apply_vet(schedule, input_date, vet_start_time, vet_end_time):
+    """Add VET to a date that is already in the schedule, merging it with any WORK shift it touches."""
     vet_start = datetime.strptime(vet_start_time, "%I:%M %p")
     vet_end = datetime.strptime(vet_end_time, "%I:%M %p")
 
@@ -0,0 +1,242 @@
+'''
+vetplan.py
+Chooses which open VET/VTO offers to accept before any of them are applied
+Maximizes paid hours while keeping the 6.5h sleep floor, the 40 hour job search goal and no overlapping offers
+Branch-and-bound over the offers in date order; sleep is checked on the routine optimize_sleep rebuilds for the accepted set
+'''
+
+import contextlib
+import copy
+import io
+import re
+from datetime import datetime
+
+import vet
+import vto
+from scheduling import (JOB_SEARCH_GOAL, MIN_SLEEP, Schedule, clean_schedule, convert_to_datetime, format_time,
+                        optimize_sleep, search_minutes_spent, time_to_minutes)
+from sleepdebt import load_sleep_debt
+
+# Constants
+JOB_SEARCH_BLOCK = 30  # Job search is assigned in 30 minute blocks
+OFFER_PATTERN = re.compile(r'(VET|VTO)\s+(\d{2}/\d{2}/\d{4})\s+(\d{1,2}:\d{2})\s*([AP]M)\s*-\s*(\d{1,2}:\d{2})\s*([AP]M)', re.IGNORECASE)
+
+def parse_offer(line):
+    '''
+    Parse "VET MM/DD/YYYY HH:MM AM - HH:MM PM" (or VTO) into an offer, or return None
+    Times are rewritten as "HH:MM AM", the format apply_vet and apply_vto expect, so "2:00PM" is accepted too
+    '''
+    match = OFFER_PATTERN.fullmatch(line.strip())
+    if not match:
+        return None
+    kind, date, start_clock, start_half, end_clock, end_half = match.groups()
+    try:
+        datetime.strptime(date, "%m/%d/%Y")
+        start_time = format_time(convert_to_datetime(f"{start_clock} {start_half.upper()}"))
+        end_time = format_time(convert_to_datetime(f"{end_clock} {end_half.upper()}"))
+    except ValueError:
+        return None  # e.g. 13:00 PM or 02/30/2026
+    return {"kind": kind.upper(), "date": date, "start_time": start_time, "end_time": end_time}
+
+def overlap(a_start, a_end, b_start, b_end):#Minutes two intervals share
+    return max(0, min(a_end, b_end) - max(a_start, b_start))
+
+def offer_value(offer, shifts):
+    '''
+    Paid minutes gained by accepting one offer on its day (negative for VTO), or None if it cannot be applied
+    shifts are the day's WORK shifts
+    '''
+    start, end = time_to_minutes(offer["start_time"]), time_to_minutes(offer["end_time"])
+    if end <= start:
+        return None  # Offers past midnight are not supported, same as VET/VTO input
+
+    work = [(time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"]))
+            for shift in shifts if shift["type"] == "WORK"]
+
+    if offer["kind"] == "VTO":
+        if not any(work_start <= start and end <= work_end for work_start, work_end in work):
+            return None  # VTO must fall inside a WORK shift
+        return -(end - start)
+
+    paid = (end - start) - sum(overlap(start, end, work_start, work_end) for work_start, work_end in work)
+    return paid if paid > 0 else None  # Nothing gained if already working then
+
+def effective_sleep(shifts):
+    '''
+    Minutes of the day covered by SLEEP and not by WORK
+    optimize_sleep can place SLEEP over a WORK shift that does not start early in the morning, that time is not slept
+    '''
+    asleep = bytearray(24 * 60)
+    for shift in shifts:
+        if shift["type"] == "SLEEP":
+            start, end = time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"])
+            asleep[start:end if end > start else 24 * 60] = b"\x01" * ((end if end > start else 24 * 60) - start)
+    for shift in shifts:
+        if shift["type"] == "WORK":
+            start, end = time_to_minutes(shift["start_time"]), time_to_minutes(shift["end_time"])
+            asleep[start:end if end > start else 24 * 60] = bytes((end if end > start else 24 * 60) - start)
+    return sum(asleep)
+
+def search_capacity(schedule, date):
+    """Job search time one day can hold: free 30 minute blocks plus sleep above the 6.5h floor."""
+    capacity = sum((end - start) // JOB_SEARCH_BLOCK * JOB_SEARCH_BLOCK for start, end in schedule.free_intervals_of(date))
+    for shift in schedule[date]:
+        if shift["type"] == "SLEEP":
+            duration = (time_to_minutes(shift["end_time"]) - time_to_minutes(shift["start_time"])) % (24 * 60)
+            capacity += max(0, duration - MIN_SLEEP)
+    return capacity
+
+def simulate_routine(work, dates, offers, ledger):
+    '''
+    Apply offers to the WORK-only days in dates and rebuild their routine with optimize_sleep
+    Returns {date: (effective sleep, job search capacity)}, or None if optimize_sleep cannot build the routine
+    The whole week is rebuilt: a shorter stretch would give its first day the nap of a day after an off day
+    '''
+    days = Schedule({date: copy.deepcopy(work[date]) for date in dates})
+    with contextlib.redirect_stdout(io.StringIO()):  # optimize_sleep and the apply functions report as they go
+        apply_offers(days, offers)
+        try:
+            optimize_sleep(days, ledger)
+        except ValueError:
+            return None  # e.g. a nap that would start before midnight
+    return {date: (effective_sleep(shifts), search_capacity(days, date)) for date, shifts in days.items()}
+
+def plan_offers(schedule, offers):
+    '''
+    Choose the subset of offers that maximizes paid minutes such that
+        no two accepted offers on the same day overlap
+        every upcoming day keeps at least 6.5h of sleep (or, if the routine already gives it less, no less than now)
+        the week's job search capacity (free time plus sleep above 6.5h) still covers the remaining goal
+    Sleep and capacity are measured on the routine optimize_sleep rebuilds once the accepted offers are applied,
+    so a VTO can win back the sleep a VET on the day before costs
+    Returns (accepted offers, paid minutes gained)
+    '''
+    today = datetime.strptime(datetime.today().strftime("%m/%d/%Y"), "%m/%d/%Y")
+    dates = sorted(schedule, key=lambda date: datetime.strptime(date, "%m/%d/%Y"))
+    position = {date: i for i, date in enumerate(dates)}
+    upcoming = [date for date in dates if datetime.strptime(date, "%m/%d/%Y") >= today]
+    work = clean_schedule(copy.deepcopy(schedule))
+    ledger = load_sleep_debt()
+
+    def window(date):#A day's routine depends on WORK up to two days either side of it
+        i = position[date]
+        return dates[max(0, i - 2):i + 3]
+
+    # Offers that can be applied, in date order so each day's sleep is settled as soon as its window is decided
+    items = []
+    for offer in offers:
+        if offer["date"] not in upcoming:
+            print(f"  Skipping {offer['kind']} on {offer['date']}: not an upcoming day in the schedule")
+            continue
+        value = offer_value(offer, work[offer["date"]])
+        if value is None:
+            print(f"  Skipping {offer['kind']} on {offer['date']} {offer['start_time']} - {offer['end_time']}: cannot be applied")
+            continue
+        items.append({"offer": offer, "value": value,
+                      "start": time_to_minutes(offer["start_time"]), "end": time_to_minutes(offer["end_time"])})
+    items.sort(key=lambda item: (position[item["offer"]["date"]], item["start"]))
+
+    # conflicts[i] is a bitmask of the items overlapping item i
+    conflicts = [0] * len(items)
+    for i, a in enumerate(items):
+        for j, b in enumerate(items):
+            if i != j and a["offer"]["date"] == b["offer"]["date"] and overlap(a["start"], a["end"], b["start"], b["end"]):
+                conflicts[i] |= 1 << j
+
+    # Items that can change each day, and the days settled once item i is decided
+    reach = {date: [i for i, item in enumerate(items) if item["offer"]["date"] in window(date)] for date in upcoming}
+    settled = [[] for _ in items]
+    for date in upcoming:
+        if reach[date]:
+            settled[reach[date][-1]].append(date)
+
+    # (sleep, capacity) of a day with the accepted items that can change it, cached since branches share most sets
+    # Offers further away are left out, they cannot change the day and would only split the cache
+    simulations = {}
+    def measure(date, chosen):
+        key = (date, frozenset(i for i in reach[date] if i in chosen))
+        if key not in simulations:
+            measures = simulate_routine(work, dates, [items[i]["offer"] for i in sorted(key[1])], ledger)
+            simulations[key] = measures[date] if measures else (float("-inf"), 0)  # Not taken if the routine breaks
+        return simulations[key]
+
+    # Routine without any offer
+    base = {date: measure(date, ()) for date in upcoming}
+    sleep_floor = {date: min(MIN_SLEEP, sleep) for date, (sleep, capacity) in base.items()}
+    capacity = sum(capacity for sleep, capacity in base.values())
+    needed = min(max(0, JOB_SEARCH_GOAL - search_minutes_spent(schedule)), capacity)  # Never less reachable than now
+
+    # Paid minutes still to gain from item i on: every undecided VET not blocked by an accepted offer
+    def bound(i, blocked):
+        return sum(items[k]["value"] for k in range(i, len(items)) if items[k]["value"] > 0 and not blocked >> k & 1)
+
+    best = {"value": 0, "chosen": ()}
+    def search(i, chosen, blocked, value, capacity):
+        if i == len(items):
+            if capacity >= needed and value > best["value"]:
+                best["value"], best["chosen"] = value, chosen
+            return
+        if value + bound(i, blocked) <= best["value"]:
+            return  # Cannot beat the best subset found so far
+
+        options = []
+        if not blocked >> i & 1:
+            options.append((chosen + (i,), blocked | conflicts[i], value + items[i]["value"]))
+        options.append((chosen, blocked, value))
+        for option_chosen, option_blocked, option_value in options:
+            # Days no later item can change are checked now, the rest once their window is decided
+            option_capacity = capacity
+            for date in settled[i]:
+                sleep, day_capacity = measure(date, option_chosen)
+                if sleep < sleep_floor[date]:
+                    break
+                option_capacity += day_capacity - base[date][1]
+            else:
+                search(i + 1, option_chosen, option_blocked, option_value, option_capacity)
+
+    search(0, (), 0, 0, capacity)
+    accepted = [items[i]["offer"] for i in best["chosen"]]
+    return accepted, best["value"]
+
+def apply_offers(schedule, offers):
+    """Apply accepted offers to a cleaned schedule (WORK shifts only)."""
+    for offer in offers:
+        if offer["kind"] == "VET":
+            schedule = vet.apply_vet(schedule, offer["date"], offer["start_time"], offer["end_time"])
+        else:
+            schedule = vto.apply_vto(schedule, offer["date"], offer["start_time"], offer["end_time"])
+
+    # optimize_sleep reads the first and last WORK shift of a day, so keep them in order
+    for offer in offers:
+        schedule[offer["date"]].sort(key=lambda x: convert_to_datetime(x["start_time"]))
+    return schedule
+
+def input_offers(schedule):
+    '''
+    Ask for a batch of open VET/VTO offers, pick the best subset and apply it if confirmed
+    Returns the cleaned schedule (WORK shifts only) so the caller can optimize it again
+    '''
+    print("Enter one offer per line as \"VET MM/DD/YYYY HH:MM AM - HH:MM PM\" (or VTO), blank line to finish:")
+    offers = []
+    while True:
+        line = input("> ")
+        if not line.strip():
+            break
+        offer = parse_offer(line)
+        if offer is None:
+            print("Error: invalid offer format, please try again.")
+            continue
+        offers.append(offer)
+
+    accepted, paid = plan_offers(schedule, offers)
+    schedule = clean_schedule(copy.deepcopy(schedule))#Remove all non-work shifts
+    if not accepted:
+        print("No offers can be taken without breaking the sleep or job search goals.")
+        return schedule
+
+    print(f"Best subset ({paid / 60:+.2f} paid hr):")
+    for offer in accepted:
+        print(f"  {offer['kind']} {offer['date']} {offer['start_time']} - {offer['end_time']}")
+    if input("Apply these offers (y/n)? ").lower() == 'y':
+        schedule = apply_offers(schedule, accepted)
+    return schedule
@@ -69,35 +69,43 @@ def input_vto(schedule):
         # For partial shift, ask for the VTO start and end time
         start_time = input("Enter VTO start time (HH:MM AM/PM): ")
         end_time = input("Enter VTO end time (HH:MM AM/PM): ")
+        schedule = apply_vto(schedule, input_date, start_time, end_time)
 
-        # Adjust the shifts accordingly
-        shifts_for_day = schedule.get(input_date, [])
-        for shift in shifts_for_day:
-            # If the VTO time falls within the shift, adjust the shift timing
-            shift_start = datetime.strptime(shift['start_time'], "%I:%M %p")
-            shift_end = datetime.strptime(shift['end_time'], "%I:%M %p")
-            vto_start = datetime.strptime(start_time, "%I:%M %p")
-            vto_end = datetime.strptime(end_time, "%I:%M %p")
+    return schedule
 
-            # Remove VTO time from the shift if it's within the shift's time
-            if vto_start >= shift_start and vto_end <= shift_end:
-                if vto_start > shift_start:
-                    # Keep the portion before VTO
-                    schedule[input_date] = [{
-                        "type": shift["type"],
-                        "start_time": shift["start_time"],
-                        "end_time": start_time
-                    }]
-                if vto_end < shift_end:
-                    # Keep the portion after VTO
-                    schedule[input_date].append({
-                        "type": shift["type"],
-                        "start_time": end_time,
-                        "end_time": shift["end_time"]
-                    })
-                print(f"Partial VTO applied from {start_time} to {end_time} on {input_date}.")
-                break
-        else:
-            print("Error: No shift found on the selected date.")
+def apply_vto(schedule, input_date, start_time, end_time):
+    """Remove partial-shift VTO from a date that is already in the schedule."""
+    # Adjust the shifts accordingly
+    shifts_for_day = schedule.get(input_date, [])
+    vto_start = datetime.strptime(start_time, "%I:%M %p")
+    vto_end = datetime.strptime(end_time, "%I:%M %p")
+    for i, shift in enumerate(shifts_for_day):
+        # If the VTO time falls within the shift, adjust the shift timing
+        shift_start = datetime.strptime(shift['start_time'], "%I:%M %p")
+        shift_end = datetime.strptime(shift['end_time'], "%I:%M %p")
 
-    return schedule
\ No newline at end of file
+        # Remove VTO time from the shift if it's within the shift's time
+        if vto_start >= shift_start and vto_end <= shift_end:
+            remaining = []
+            if vto_start > shift_start:
+                # Keep the portion before VTO
+                remaining.append({
+                    "type": shift["type"],
+                    "start_time": shift["start_time"],
+                    "end_time": start_time
+                })
+            if vto_end < shift_end:
+                # Keep the portion after VTO
+                remaining.append({
+                    "type": shift["type"],
+                    "start_time": end_time,
+                    "end_time": shift["end_time"]
+                })
+            # Replace only this shift, other shifts on the day are kept
+            schedule[input_date] = shifts_for_day[:i] + remaining + shifts_for_day[i + 1:]
+            print(f"Partial VTO applied from {start_time} to {end_time} on {input_date}.")
+            break
+    else:
+        print("Error: No shift found on the selected date.")
+
+    return schedule